@@ -11,20 +11,35 @@ Responsabilidades:
 
 from __future__ import annotations
 
+import logging
+import sys
 from datetime import datetime, timezone
+from functools import lru_cache
 from typing import Any, Dict, List, Optional, Tuple
 
-from pymongo import MongoClient, ReplaceOne
+from pymongo import UpdateOne
+from pymongo.errors import OperationFailure
 from zoneinfo import ZoneInfo
 
+from commons.scraper_utils import get_mongo_client, parse_utc_z
+
 BR_TZ = ZoneInfo("America/Sao_Paulo")
 UTC = timezone.utc
+# A partir do 3.11 o fromisoformat aceita "Z" e separador por espaço nativamente.
+_NATIVE_ISO = sys.version_info >= (3, 11)
+# Separadores em ordem de prioridade (o primeiro presente que gera dois lados vence).
+_MATCH_SEPARATORS = (" - ", "-", " vs ", " v ", " x ", " X ", "·", "•", " – ", "–", "|")
 
 
 def split_match_name(name: str) -> Tuple[str, str]:
-    text = str(name or "").strip()
-    separators = [" - ", "-", " vs ", " v ", " x ", " X ", "·", "•", " – ", "–", "|"]
-    for sep in separators:
+    return _split_text(str(name or "").strip())
+
+
+# O mesmo confronto aparece em vários providers/execuções; o resultado (tupla) é imutável e seguro para cache.
+@lru_cache(maxsize=8192)
+def _split_text(text: str) -> Tuple[str, str]:
+    # Laço simples: o caso comum (" - ") sai na primeira iteração só com um "in" e um split.
+    for sep in _MATCH_SEPARATORS:
         if sep in text:
             parts = [part.strip() for part in text.split(sep, 1)]
             if len(parts) == 2 and all(parts):
@@ -32,9 +47,29 @@ def split_match_name(name: str) -> Tuple[str, str]:
     return text, ""
 
 
+def _parse_iso(text: str) -> datetime:
+    if _NATIVE_ISO:
+        return datetime.fromisoformat(text)
+    if " " in text and "T" not in text:
+        text = text.replace(" ", "T", 1)
+    return datetime.fromisoformat(text.replace("Z", "+00:00"))
+
+
+def _format_utc(dt_value: datetime) -> str:
+    return (
+        f"{dt_value.year:04d}-{dt_value.month:02d}-{dt_value.day:02d}"
+        f"T{dt_value.hour:02d}:{dt_value.minute:02d}:{dt_value.second:02d}Z"
+    )
+
+
 def to_utc_iso(value: Any) -> Optional[str]:
     if value is None:
         return None
+    # Caminhos rápidos para o formato dominante: string já em "YYYY-MM-DDTHH:MM:SSZ" ou datetime em UTC/naive.
+    if isinstance(value, str) and parse_utc_z(value) is not None:
+        return value
+    if isinstance(value, datetime) and (value.tzinfo is None or value.tzinfo is UTC):
+        return _format_utc(value)
     try:
         if isinstance(value, datetime):
             dt_value = value
@@ -42,28 +77,50 @@ def to_utc_iso(value: Any) -> Optional[str]:
             text = str(value).strip()
             if not text:
                 return None
-            if " " in text and "T" not in text:
-                text = text.replace(" ", "T", 1)
-            dt_value = datetime.fromisoformat(text.replace("Z", "+00:00"))
+            dt_value = _parse_iso(text)
         if dt_value.tzinfo is None:
             dt_value = dt_value.replace(tzinfo=UTC)
-        return dt_value.astimezone(UTC).strftime("%Y-%m-%dT%H:%M:%SZ")
+        return _format_utc(dt_value.astimezone(UTC))
     except Exception:
         return None
 
 
-def to_local_iso(utc_iso: Optional[str]) -> Optional[str]:
-    if not utc_iso:
-        return None
+# Jogos costumam compartilhar horários: a conversão para America/Sao_Paulo é feita uma vez por kickoff.
+@lru_cache(maxsize=8192)
+def _local_from_utc_iso(utc_iso: str) -> Optional[str]:
     try:
-        dt_value = datetime.fromisoformat(utc_iso.replace("Z", "+00:00"))
+        dt_value = _parse_iso(utc_iso)
         return dt_value.astimezone(BR_TZ).isoformat()
     except Exception:
         return None
 
 
-def merge_normalized(existing: Optional[Dict[str, Any]], incoming: Dict[str, Any]) -> Dict[str, Any]:
-    merged = dict(existing) if existing else {}
+def to_local_iso(utc_iso: Optional[str]) -> Optional[str]:
+    if not utc_iso:
+        return None
+    return _local_from_utc_iso(utc_iso)
+
+
+def merge_normalized(
+    existing: Optional[Dict[str, Any]],
+    incoming: Dict[str, Any],
+    *,
+    now: Optional[datetime] = None,
+) -> Dict[str, Any]:
+    now = now or datetime.now(tz=UTC)
+    if not existing:
+        # Inserção pura: não há o que mesclar, monta o documento direto a partir do incoming.
+        merged = {"eventId": incoming.get("eventId"), "normalizedId": incoming.get("normalizedId")}
+        for field in ("home", "away", "kickoff"):
+            if incoming.get(field):
+                merged[field] = incoming[field]
+        # Uma entrada por provider, como no caminho de update (a última ocorrência vence).
+        by_provider = {src["provider"]: src for src in incoming.get("sources", []) if src.get("provider")}
+        merged["sources"] = list(by_provider.values())
+        merged["updatedAt"] = incoming.get("updatedAt") or now
+        merged["createdAt"] = incoming.get("createdAt") or now
+        return merged
+    merged = dict(existing)
     merged.setdefault("eventId", incoming.get("eventId"))
     merged.setdefault("normalizedId", incoming.get("normalizedId"))
     for field in ("home", "away", "kickoff"):
@@ -76,21 +133,91 @@ def merge_normalized(existing: Optional[Dict[str, Any]], incoming: Dict[str, Any
             continue
         merged_sources[key] = src
     merged["sources"] = list(merged_sources.values())
-    merged["updatedAt"] = incoming.get("updatedAt") or datetime.now(tz=UTC)
-    merged.setdefault("createdAt", incoming.get("createdAt") or datetime.now(tz=UTC))
+    merged["updatedAt"] = incoming.get("updatedAt") or now
+    merged.setdefault("createdAt", incoming.get("createdAt") or now)
     return merged
 
 
-def _fetch_existing_map(collection, ids: List[str]) -> dict:
+# Únicos campos lidos por merge_normalized; o restante do documento existente não precisa trafegar.
+_MERGE_PROJECTION = {
+    "normalizedId": 1,
+    "eventId": 1,
+    "home": 1,
+    "away": 1,
+    "kickoff": 1,
+    "sources": 1,
+    "createdAt": 1,
+}
+# full_name -> se o índice único de normalizedId existe (e pode ir no hint); verificado uma vez por processo.
+_INDEXED_COLLECTIONS: dict[str, bool] = {}
+# Limita o tamanho de cada $in para evitar planos/respostas gigantes em lotes grandes.
+EXISTING_LOOKUP_CHUNK = 500
+
+
+def _ensure_indexes(collection) -> bool:
+    name = collection.full_name
+    if name not in _INDEXED_COLLECTIONS:
+        try:
+            collection.create_index("normalizedId", unique=True)
+            _INDEXED_COLLECTIONS[name] = True
+        except OperationFailure as exc:
+            # normalizedId duplicado ou índice não-único pré-existente: grava sem o índice e sem hint.
+            logging.warning("Índice único de normalizedId indisponível em %s: %s", name, exc)
+            _INDEXED_COLLECTIONS[name] = False
+    return _INDEXED_COLLECTIONS[name]
+
+
+def _fetch_existing_map(collection, ids: List[str], *, use_hint: bool = True) -> dict:
     existing: dict[str, Dict[str, Any]] = {}
     if not ids:
         return existing
-    cursor = collection.find({"normalizedId": {"$in": ids}})
-    for doc in cursor:
-        existing[str(doc.get("normalizedId"))] = doc
+    for start in range(0, len(ids), EXISTING_LOOKUP_CHUNK):
+        chunk = ids[start : start + EXISTING_LOOKUP_CHUNK]
+        cursor = collection.find({"normalizedId": {"$in": chunk}}, projection=_MERGE_PROJECTION)
+        if use_hint:
+            cursor = cursor.hint([("normalizedId", 1)])
+        cursor = cursor.batch_size(EXISTING_LOOKUP_CHUNK)
+        try:
+            for doc in cursor:
+                existing[str(doc.get("normalizedId"))] = doc
+        finally:
+            cursor.close()
     return existing
 
 
+def _single_source(incoming: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    sources = incoming.get("sources") or []
+    if len(sources) == 1 and sources[0].get("provider"):
+        return sources[0]
+    return None
+
+
+# Equivalente server-side (pipeline de update) de merge_normalized para um único provider.
+def _source_update(norm_id: Any, incoming: Dict[str, Any], source: Dict[str, Any], now: datetime) -> UpdateOne:
+    fields: Dict[str, Any] = {
+        "eventId": {"$ifNull": ["$eventId", {"$literal": incoming.get("eventId")}]},
+    }
+    for field in ("home", "away", "kickoff"):
+        value = incoming.get(field)
+        if value:
+            current = f"${field}"
+            fields[field] = {"$cond": [{"$eq": [{"$ifNull": [current, ""]}, ""]}, {"$literal": value}, current]}
+    fields["sources"] = {
+        "$concatArrays": [
+            {
+                "$filter": {
+                    "input": {"$ifNull": ["$sources", []]},
+                    "cond": {"$ne": ["$$this.provider", {"$literal": source["provider"]}]},
+                }
+            },
+            {"$literal": [source]},
+        ]
+    }
+    fields["updatedAt"] = {"$literal": incoming.get("updatedAt") or now}
+    fields["createdAt"] = {"$ifNull": ["$createdAt", {"$literal": incoming.get("createdAt") or now}]}
+    return UpdateOne({"normalizedId": norm_id}, [{"$set": fields}], upsert=True)
+
+
 def upsert_normalized(
     documents: List[Dict[str, Any]],
     *,
@@ -100,20 +227,36 @@ def upsert_normalized(
 ) -> int:
     if not documents:
         return 0
-    client = MongoClient(mongo_uri)
-    collection = client[mongo_db][mongo_collection]
-    norm_ids = [doc.get("normalizedId") or doc.get("eventId") for doc in documents if doc.get("normalizedId") or doc.get("eventId")]
-    existing_map = _fetch_existing_map(collection, norm_ids)
-    operations: List[ReplaceOne] = []
-    for doc, norm_id in zip(documents, norm_ids):
-        if not norm_id:
+    collection = get_mongo_client(mongo_uri)[mongo_db][mongo_collection]
+    indexed = _ensure_indexes(collection)
+    keyed = [
+        (doc.get("normalizedId") or doc.get("eventId"), doc)
+        for doc in documents
+        if doc.get("normalizedId") or doc.get("eventId")
+    ]
+    # Um único "agora" por lote: todos os documentos compartilham o mesmo updatedAt/createdAt.
+    batch_now = datetime.now(tz=UTC)
+    operations: List[UpdateOne] = []
+    multi_source: List[Tuple[Any, Dict[str, Any]]] = []
+    for norm_id, doc in keyed:
+        source = _single_source(doc)
+        if source is None:
+            multi_source.append((norm_id, doc))
             continue
-        existing = existing_map.get(str(norm_id))
-        merged = merge_normalized(existing, doc)
-        operations.append(ReplaceOne({"normalizedId": norm_id}, merged, upsert=True))
+        # Caso comum (um provider por documento): o merge roda no servidor, sem ler o existente.
+        operations.append(_source_update(norm_id, doc, source, batch_now))
+    if multi_source:
+        existing_map = _fetch_existing_map(
+            collection, [norm_id for norm_id, _ in multi_source], use_hint=indexed
+        )
+        for norm_id, doc in multi_source:
+            existing = existing_map.get(str(norm_id))
+            merged = merge_normalized(existing, doc, now=batch_now)
+            merged.pop("_id", None)
+            # $set só toca os campos mesclados: o que ficou fora da projeção (outros writers/schemas) sobrevive.
+            operations.append(UpdateOne({"normalizedId": norm_id}, {"$set": merged}, upsert=True))
     upserted = 0
     if operations:
-        result = collection.bulk_write(operations, ordered=False)
+        result = collection.bulk_write(operations, ordered=False, bypass_document_validation=True)
         upserted = (result.upserted_count or 0) + (result.modified_count or 0)
-    client.close()
     return upserted
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Utilidades compartilhadas pelos scrapers brutos (python-scrappers).
+
+Responsabilidades:
+- Decodificar/serializar JSON com orjson quando disponível (fallback para json da stdlib).
+- Interpretar rápido datas no formato dominante das APIs ("YYYY-MM-DDTHH:MM:SSZ").
+- Limitar a taxa de requisições somando todas as threads (RateLimiter).
+- Gravar lotes no Mongo em uma thread dedicada, propagando falhas para o chamador (BatchWriter).
+- Reaproveitar um MongoClient por URI durante todo o processo (get_mongo_client).
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import logging
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Optional
+
+from pymongo import MongoClient
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - fallback para ambientes sem orjson
+    orjson = None
+
+
+def loads_json(content: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(content)
+    # As APIs sempre respondem UTF-8; decodifica direto sem a detecção de encoding do json.loads(bytes).
+    return json.loads(content.decode("utf-8"))
+
+
+def dumps_json_line(payload: Any) -> bytes:
+    """Uma linha JSON Lines (com o \\n final)."""
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_NAIVE_UTC | orjson.OPT_APPEND_NEWLINE)
+    return json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8") + b"\n"
+
+
+def dumps_json_pretty(payload: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(payload, ensure_ascii=False, indent=2, default=str).encode("utf-8")
+
+
+def parse_utc_z(text: str) -> Optional[datetime]:
+    """Monta o datetime de "YYYY-MM-DDTHH:MM:SSZ" pelas fatias; None para qualquer outro texto."""
+    if not (
+        len(text) == 20
+        and text[19] == "Z"
+        and text[10] == "T"
+        and text[4] == text[7] == "-"
+        and text[13] == text[16] == ":"
+    ):
+        return None
+    fields = (text[0:4], text[5:7], text[8:10], text[11:13], text[14:16], text[17:19])
+    # Só dígitos ASCII: barra o que int() aceitaria e o fromisoformat não (espaços, sinais, "_", "１").
+    if not all(field.isascii() and field.isdigit() for field in fields):
+        return None
+    try:
+        return datetime(*map(int, fields), tzinfo=timezone.utc)
+    except ValueError:
+        # Formato certo, data impossível (30/02, mês 13, 25h): o chamador segue pelo caminho lento.
+        return None
+
+
+_CLIENT_CACHE: dict[str, MongoClient] = {}
+
+
+def get_mongo_client(uri: str) -> MongoClient:
+    # Um cliente por URI durante todo o processo: evita refazer descoberta de topologia/TLS a cada chamada.
+    client = _CLIENT_CACHE.get(uri)
+    if client is None:
+        client = MongoClient(uri, maxPoolSize=50, retryWrites=True, w=1)
+        _CLIENT_CACHE[uri] = client
+    return client
+
+
+@atexit.register
+def _close_clients() -> None:
+    for client in _CLIENT_CACHE.values():
+        client.close()
+    _CLIENT_CACHE.clear()
+
+
+class RateLimiter:
+    """Espaça as requisições compartilhadas entre threads para no máximo `rate` por segundo."""
+
+    def __init__(self, rate: float) -> None:
+        self._interval = 1.0 / rate if rate > 0 else 0.0
+        self._next_allowed = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        if not self._interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next_allowed - now
+            self._next_allowed = max(now, self._next_allowed) + self._interval
+        if wait > 0:
+            time.sleep(wait)
+
+
+class BatchWriter:
+    """
+    Consome lotes de uma fila curta e chama `save(batch)` em uma thread dedicada.
+
+    `save` retorna quantos documentos gravou; `saved` só soma lotes gravados com sucesso.
+    A primeira falha fica em `error` e a thread passa apenas a drenar a fila, para o produtor
+    não travar com ela cheia; `raise_if_failed()` relança a falha depois de `close()`.
+    """
+
+    def __init__(self, save: Callable[[list], int], *, maxsize: int, name: str) -> None:
+        self._save = save
+        self._batches: queue.Queue = queue.Queue(maxsize=maxsize)
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self.saved = 0
+        self.error: Optional[BaseException] = None
+
+    def start(self) -> "BatchWriter":
+        self._thread.start()
+        return self
+
+    def put(self, batch: list) -> None:
+        # A lista passa a pertencer ao writer: o chamador deve começar um novo buffer.
+        self._batches.put(batch)
+
+    def close(self) -> None:
+        self._batches.put(None)
+        self._thread.join()
+
+    def raise_if_failed(self) -> None:
+        if self.error is not None:
+            raise self.error
+
+    def _run(self) -> None:
+        while True:
+            batch = self._batches.get()
+            if batch is None:
+                return
+            if self.error is not None:
+                continue
+            try:
+                self.saved += self._save(batch)
+            except Exception as exc:
+                logging.error("Falha ao salvar lote de %s documentos: %s", len(batch), exc)
+                self.error = exc
@@ -11,15 +11,23 @@ Fluxo:
 from __future__ import annotations
 
 import argparse
-import json
 import logging
 import sys
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timezone
-from typing import Any, Dict, Iterable, List, Optional, Sequence, Set
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 
 import requests
-from pymongo import MongoClient, ReplaceOne
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from pymongo import ReplaceOne, WriteConcern
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from commons.scraper_utils import RateLimiter, dumps_json_pretty, get_mongo_client, loads_json
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
 
@@ -37,6 +45,9 @@ DEFAULT_MONGO_COLLECTION = "betmgm"
 DEFAULT_DAYS = 4
 DEFAULT_FIRST = 50
 DEFAULT_MAX_WORKERS = 8
+DEFAULT_PREFETCH_PAGES = 4
+DEFAULT_MAX_RPS = 20.0
+BULK_WRITE_CHUNK = 500
 
 GRAPHQL_HEADERS = {
     "content-type": "application/json",
@@ -81,6 +92,18 @@ def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
         default=DEFAULT_MAX_WORKERS,
         help="Workers para detalhar eventos em paralelo",
     )
+    parser.add_argument(
+        "--prefetch-pages",
+        type=int,
+        default=DEFAULT_PREFETCH_PAGES,
+        help="Páginas GraphQL buscadas em paralelo quando o cursor é numérico (1 desativa)",
+    )
+    parser.add_argument(
+        "--max-rps",
+        type=float,
+        default=DEFAULT_MAX_RPS,
+        help="Limite de requisições de detalhe por segundo somando todos os workers (0 desativa)",
+    )
     return parser.parse_args(argv)
 
 
@@ -108,57 +131,84 @@ def graph_payload(after: str, first: int, days: int) -> dict:
     }
 
 
-def fetch_events_graphql(session: requests.Session, days: int, first: int) -> List[dict]:
+def fetch_graphql_page(session: requests.Session, after: str, first: int, days: int) -> tuple[List[dict], dict]:
+    # Devolve só os eventos e o pageInfo: o dict completo da página morre aqui, antes da próxima requisição.
+    payload = graph_payload(after, first, days)
+    resp = session.post(GRAPHQL_URL, headers=GRAPHQL_HEADERS, json=payload, timeout=15)
+    resp.raise_for_status()
+    data = loads_json(resp.content)
+    try:
+        connection = data["data"]["viewer"]["sports"]["sportsEventsConnection"]
+    except (KeyError, TypeError):
+        return [], {}
+    edges = connection.get("edges") or []
+    page_info = connection.get("pageInfo") or {}
     events: List[dict] = []
-    after = "0"
-    page = 0
-    while True:
-        payload = graph_payload(after, first, days)
-        resp = session.post(GRAPHQL_URL, headers=GRAPHQL_HEADERS, json=payload, timeout=15)
-        resp.raise_for_status()
-        data = resp.json()
-        edges = (
-            data.get("data", {})
-            .get("viewer", {})
-            .get("sports", {})
-            .get("sportsEventsConnection", {})
-            .get("edges", [])
-        )
-        page_info = (
-            data.get("data", {})
-            .get("viewer", {})
-            .get("sports", {})
-            .get("sportsEventsConnection", {})
-            .get("pageInfo", {})
-        )
-        page += 1
-        logging.info("Página %s: edges=%s", page, len(edges))
-        for edge in edges:
-            node = edge.get("node") or {}
-            for group in node.get("groups") or []:
-                for event in group.get("events") or []:
-                    events.append(event)
-        has_next = page_info.get("hasNextPage")
-        end_cursor = page_info.get("endCursor")
-        if not has_next or end_cursor is None:
-            break
-        after = str(end_cursor)
-    return events
-
-
-def dedupe_events(events: Iterable[dict]) -> List[dict]:
-    seen: Set[str] = set()
-    deduped: List[dict] = []
-    for evt in events:
-        eid = str(evt.get("id") or evt.get("eventId") or "")
-        if not eid or eid in seen:
+    for edge in edges:
+        node = edge.get("node")
+        if not node:
             continue
-        seen.add(eid)
-        deduped.append(evt)
-    return deduped
+        for group in node.get("groups") or ():
+            group_events = group.get("events")
+            if group_events:
+                events.extend(group_events)
+    return events, page_info
+
+
+def _cursor_step(after: str, end_cursor: str) -> Optional[int]:
+    if not (after.isdigit() and end_cursor.isdigit()):
+        return None
+    step = int(end_cursor) - int(after)
+    return step if step > 0 else None
+
+
+def _predict_cursors(after: str, step: Optional[int], count: int) -> List[str]:
+    if step is None or count <= 1 or not after.isdigit():
+        return [after]
+    base = int(after)
+    return [str(base + step * idx) for idx in range(count)]
+
+
+def fetch_events_graphql(
+    session: requests.Session, days: int, first: int, prefetch: int = DEFAULT_PREFETCH_PAGES
+) -> List[dict]:
+    # Dedupe inline: mantém a primeira ocorrência de cada id enquanto pagina.
+    events_by_id: Dict[str, dict] = {}
+    after: Optional[str] = "0"
+    step: Optional[int] = None
+    page = 0
+    prefetch = max(1, prefetch)
+    with ThreadPoolExecutor(max_workers=prefetch, thread_name_prefix="betmgm-graphql") as executor:
+        while after is not None:
+            # Com cursor numérico e passo já observado, busca as próximas páginas em paralelo;
+            # cursores opacos caem para uma página por vez.
+            cursors = _predict_cursors(after, step, prefetch)
+            futures = [executor.submit(fetch_graphql_page, session, cursor, first, days) for cursor in cursors]
+            for cursor, future in zip(cursors, futures):
+                if cursor != after:
+                    # Previsão não bate com o endCursor real: descarta o restante e segue do cursor real.
+                    break
+                page_events, page_info = future.result()
+                page += 1
+                logging.info("Página %s: eventos=%s", page, len(page_events))
+                for event in page_events:
+                    eid = str(event.get("id") or event.get("eventId") or "")
+                    if eid and eid not in events_by_id:
+                        events_by_id[eid] = event
+                end_cursor = page_info.get("endCursor")
+                if not page_info.get("hasNextPage") or end_cursor is None:
+                    after = None
+                    break
+                after = str(end_cursor)
+                step = _cursor_step(cursor, after)
+            for future in futures:
+                future.cancel()
+    return list(events_by_id.values())
 
 
-def fetch_event_detail(session: requests.Session, event_id: str) -> Optional[dict]:
+def fetch_event_detail(
+    session: requests.Session, event_id: str, limiter: Optional[RateLimiter] = None
+) -> Optional[dict]:
     url = OFFERING_EVENT_URL.format(event_id=event_id)
     params = {
         "channel_id": "1",
@@ -168,49 +218,76 @@ def fetch_event_detail(session: requests.Session, event_id: str) -> Optional[dic
         "market": "BR",
         "range_size": "1",
     }
+    if limiter is not None:
+        limiter.acquire()
     resp = session.get(url, headers=OFFERING_HEADERS, params=params, timeout=15)
     if resp.status_code != 200:
         logging.warning("Detalhe %s status %s", event_id, resp.status_code)
         return None
     try:
-        return resp.json()
+        return loads_json(resp.content)
     except ValueError:
         logging.warning("JSON inválido no detalhe %s", event_id)
         return None
 
 
-def enrich_events(events: List[dict], max_workers: int) -> List[dict]:
+def build_session(max_workers: int = DEFAULT_MAX_WORKERS) -> requests.Session:
     session = requests.Session()
-    enriched: List[dict] = []
+    # Respeita Retry-After em 429/503 para não perder eventos quando a CDN limita a taxa.
+    retry = Retry(
+        total=5,
+        backoff_factor=0.5,
+        status_forcelist=[429, 500, 502, 503, 504],
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    # Dois hosts (GraphQL e offering-api); pool com folga para os workers manterem keep-alive.
+    adapter = HTTPAdapter(pool_connections=2, pool_maxsize=max(1, max_workers) * 2, max_retries=retry)
+    session.mount("https://", adapter)
+    return session
+
+
+def iter_enriched(
+    session: requests.Session, events: List[dict], max_workers: int, max_rps: float = DEFAULT_MAX_RPS
+) -> Iterator[Tuple[dict, dict]]:
+    # Gera (evento, detalhe) à medida que cada detalhe chega; o detalhe não é anexado ao evento
+    # para que a lista original não retenha todos os payloads até o fim.
+    limiter = RateLimiter(max_rps)
     with ThreadPoolExecutor(max_workers=max_workers) as executor:
         future_map = {
-            executor.submit(fetch_event_detail, session, str(evt.get("id") or evt.get("eventId"))): evt for evt in events
+            executor.submit(fetch_event_detail, session, str(evt.get("id") or evt.get("eventId")), limiter): evt
+            for evt in events
         }
         for idx, future in enumerate(as_completed(future_map), 1):
-            evt = future_map[future]
+            evt = future_map.pop(future)
             detail = None
             try:
                 detail = future.result()
             except Exception as exc:  # pragma: no cover
                 logging.warning("Erro detalhe %s: %s", evt.get("id"), exc)
             if detail:
-                evt["raw"] = detail
-                enriched.append(evt)
+                yield evt, detail
             if idx % 100 == 0:
                 logging.info("... %s/%s eventos enriquecidos", idx, len(events))
-    return enriched
 
 
-def save_raw(events: List[dict], args: argparse.Namespace) -> None:
-    if not events:
-        logging.warning("Nenhum evento para salvar")
-        return
-    client = MongoClient(args.mongo_uri)
-    collection = client[args.mongo_db][args.mongo_collection]
+def save_raw(enriched: Iterable[Tuple[dict, dict]], args: argparse.Namespace) -> int:
+    collection = get_mongo_client(args.mongo_uri)[args.mongo_db][args.mongo_collection].with_options(
+        write_concern=WriteConcern(w=1, j=False)
+    )
     operations: List[ReplaceOne] = []
+    # Timestamp calculado uma vez por lote e reutilizado em todos os documentos.
     captured_at = datetime.now(tz=timezone.utc)
-    for evt in events:
-        raw = evt.get("raw") or evt
+    saved = upserted = modified = 0
+
+    def flush() -> None:
+        nonlocal upserted, modified
+        result = collection.bulk_write(operations, ordered=False, bypass_document_validation=True)
+        upserted += result.upserted_count
+        modified += result.modified_count
+        operations.clear()
+
+    for evt, raw in enriched:
         event_id = str(evt.get("id") or evt.get("eventId") or raw.get("eventId") or "")
         if not event_id:
             continue
@@ -224,37 +301,54 @@ def save_raw(events: List[dict], args: argparse.Namespace) -> None:
             "raw": raw,
         }
         operations.append(ReplaceOne({"eventId": event_id}, doc, upsert=True))
+        saved += 1
+        # Grava em blocos enquanto o enriquecimento continua: o pico de memória fica limitado ao bloco.
+        if len(operations) >= BULK_WRITE_CHUNK:
+            flush()
     if operations:
-        result = collection.bulk_write(operations, ordered=False)
-        logging.info(
-            "Dump salvo em %s.%s (upserted=%s, modified=%s)",
-            args.mongo_db,
-            args.mongo_collection,
-            result.upserted_count,
-            result.modified_count,
-        )
-    client.close()
+        flush()
+    if not saved:
+        logging.warning("Nenhum evento para salvar")
+        return 0
+    logging.info(
+        "Dump salvo em %s.%s (upserted=%s, modified=%s)",
+        args.mongo_db,
+        args.mongo_collection,
+        upserted,
+        modified,
+    )
+    return saved
 
 
 def save_json(events: List[dict], path: str) -> None:
     payload = {"scraped_at": datetime.now(tz=timezone.utc).isoformat(), "events": events}
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(payload, f, ensure_ascii=False, indent=2)
+    with open(path, "wb") as f:
+        f.write(dumps_json_pretty(payload))
     logging.info("Dump salvo em %s", path)
 
 
+def _collect_for_json(enriched: Iterable[Tuple[dict, dict]], collected: List[dict]) -> Iterator[Tuple[dict, dict]]:
+    # Só usado com --json: o dump em arquivo precisa dos eventos completos ao final.
+    for evt, detail in enriched:
+        evt["raw"] = detail
+        collected.append(evt)
+        yield evt, detail
+
+
 def main(argv: Sequence[str] | None = None) -> None:
     args = parse_args(argv)
-    session = requests.Session()
+    session = build_session(args.max_workers)
     logging.info("Coletando eventos BetMGM | days=%s | page_size=%s", args.days, args.first)
-    events = fetch_events_graphql(session, args.days, args.first)
-    events = dedupe_events(events)
+    events = fetch_events_graphql(session, args.days, args.first, args.prefetch_pages)
     logging.info("Eventos coletados (dedupe): %s", len(events))
-    enriched = enrich_events(events, args.max_workers)
-    logging.info("Eventos enriquecidos: %s", len(enriched))
-    save_raw(enriched, args)
+    enriched = iter_enriched(session, events, args.max_workers, args.max_rps)
+    collected: List[dict] = []
+    if args.json:
+        enriched = _collect_for_json(enriched, collected)
+    saved = save_raw(enriched, args)
+    logging.info("Eventos enriquecidos: %s", saved)
     if args.json:
-        save_json(enriched, args.json)
+        save_json(collected, args.json)
     logging.info("Concluído.")
 
 
@@ -12,23 +12,25 @@ Fluxo:
 from __future__ import annotations
 
 import argparse
-import json
 import logging
 import sys
-import threading
-import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta, timezone
+from functools import partial
 from pathlib import Path
 from typing import Any, Dict, Iterable, List, Sequence
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from pymongo import MongoClient, ReplaceOne
 
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.append(str(PROJECT_ROOT))
 
+from commons.scraper_utils import BatchWriter, RateLimiter, dumps_json_line, loads_json, parse_utc_z
+
 logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
 
 BASE_URL = "https://www.sportingbet.bet.br"
@@ -69,29 +71,40 @@ SPORTS_HEADERS = {
     "referer": SPORT_URL,
 }
 
+# Headers finais por endpoint, montados uma vez em vez de a cada requisicao.
+CDS_FULL_HEADERS = {**COMMON_HEADERS, **CDS_HEADERS}
+SPORTS_FULL_HEADERS = {**COMMON_HEADERS, **SPORTS_HEADERS}
+
 DEFAULT_MAX_WORKERS = 8
 MAX_WORKERS_CAP = 12
-DEFAULT_FLUSH_BATCH = 200
+DEFAULT_FLUSH_BATCH = 1000
 DEFAULT_TIMEOUT = 20.0
-_THREAD_LOCAL = threading.local()
-TEAM_PARTICIPANT_TYPES = {"HomeTeam", "AwayTeam", "Team", "Competitor"}
-BASE_ALLOWED_MARKET_TYPES = {
-    "3way",
-    "BTTS",
-    "DoubleChance",
-    "DrawNoBet",
-    "Handicap",
-    "2wayHandicap",
-    "ThreeWayAndBTTS",
-    "ToWinAndBTTS",
-    "ThreeWayAndOverUnder",
-    "DoubleChanceAndOverUnder",
-}
-PROMO_MARKET_SUBTYPES = {
-    "Build a Bet - Price Boost",  # price boost cards
-    "BigOdd",  # mercado de odd turbinada
-    "2Up3wayPricing",  # VP+2 (paga se abrir 2 gols)
-}
+DEFAULT_MAX_RPS = 20.0
+# Conjuntos de consulta congelados; membros internados para comparacao por identidade quando possivel.
+TEAM_PARTICIPANT_TYPES = frozenset(sys.intern(s) for s in ("HomeTeam", "AwayTeam", "Team", "Competitor"))
+BASE_ALLOWED_MARKET_TYPES = frozenset(
+    sys.intern(s)
+    for s in (
+        "3way",
+        "BTTS",
+        "DoubleChance",
+        "DrawNoBet",
+        "Handicap",
+        "2wayHandicap",
+        "ThreeWayAndBTTS",
+        "ToWinAndBTTS",
+        "ThreeWayAndOverUnder",
+        "DoubleChanceAndOverUnder",
+    )
+)
+PROMO_MARKET_SUBTYPES = frozenset(
+    sys.intern(s)
+    for s in (
+        "Build a Bet - Price Boost",  # price boost cards
+        "BigOdd",  # mercado de odd turbinada
+        "2Up3wayPricing",  # VP+2 (paga se abrir 2 gols)
+    )
+)
 
 
 def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
@@ -103,7 +116,11 @@ def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
         default=DEFAULT_MONGO_COLLECTION,
         help="Colecao de destino para os dumps brutos",
     )
-    parser.add_argument("--json", type=Path, help="Arquivo opcional para salvar todos os eventos coletados")
+    parser.add_argument(
+        "--json",
+        type=Path,
+        help="Arquivo opcional (JSON Lines, um evento por linha) gravado a medida que os eventos sao enriquecidos",
+    )
     parser.add_argument("--access-id", default=DEFAULT_ACCESS_ID, help="x-bwin-accessid usado nas chamadas CDS")
     parser.add_argument(
         "--hours",
@@ -129,6 +146,12 @@ def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
         help="Quantidade de eventos enriquecidos antes de salvar no Mongo (>=1).",
     )
     parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="Timeout das requisicoes (s)")
+    parser.add_argument(
+        "--max-rps",
+        type=float,
+        default=DEFAULT_MAX_RPS,
+        help="Limite de requisicoes de competicoes por segundo somando todos os workers (0 desativa)",
+    )
     parser.add_argument(
         "--max-competitions",
         type=int,
@@ -146,14 +169,16 @@ def build_session() -> requests.Session:
     session = requests.Session()
     session.headers.update(COMMON_HEADERS)
     session.headers.update({"referer": SPORT_URL, "x-bwin-browser-url": SPORT_URL})
-    return session
-
-
-def _session() -> requests.Session:
-    session = getattr(_THREAD_LOCAL, "session", None)
-    if session is None:
-        session = build_session()
-        _THREAD_LOCAL.session = session
+    # Pool com folga para os workers manterem keep-alive; retries de falhas transitórias ficam no adapter.
+    retry = Retry(
+        total=3,
+        backoff_factor=0.3,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=("GET",),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=retry)
+    session.mount("https://", adapter)
     return session
 
 
@@ -171,11 +196,9 @@ def fetch_counts(session: requests.Session, access_id: str, timeout: float) -> l
         "participantMapping": "All",
         "includeDynamicCategories": "false",
     }
-    headers = dict(COMMON_HEADERS)
-    headers.update(CDS_HEADERS)
-    resp = session.get(COUNT_ENDPOINT, params=params, headers=headers, timeout=timeout)
+    resp = session.get(COUNT_ENDPOINT, params=params, headers=CDS_FULL_HEADERS, timeout=timeout)
     resp.raise_for_status()
-    data = resp.json()
+    data = loads_json(resp.content)
     if not isinstance(data, list):
         logging.warning("Resposta inesperada em counts: %s", type(data))
         return []
@@ -183,54 +206,57 @@ def fetch_counts(session: requests.Session, access_id: str, timeout: float) -> l
 
 
 def parse_competitions(counts: Iterable[dict]) -> list[dict]:
+    counts = list(counts)
     regions: Dict[int, str] = {}
-    competitions: list[dict] = []
     for item in counts:
-        tag = item.get("tag") or {}
-        tag_type = tag.get("type")
-        if tag_type == "Region":
-            region_id = tag.get("id")
-            if region_id is not None:
-                regions[region_id] = (tag.get("name") or {}).get("value") or ""
-        elif tag_type == "Competition":
-            competitions.append(tag)
-    parsed: list[dict] = []
-    for comp in competitions:
-        comp_id = comp.get("id")
-        region_id = comp.get("parentId")
-        if comp_id is None or region_id is None:
+        tag = item.get("tag")
+        if not tag or tag.get("type") != "Region":
             continue
-        parsed.append(
-            {
-                "competitionId": comp_id,
-                "compoundId": comp.get("compoundId") or f"{comp.get('sportId')}:{comp_id}",
-                "regionId": region_id,
-                "regionName": regions.get(region_id, ""),
-                "competitionName": (comp.get("name") or {}).get("value") or "",
-            }
-        )
-    return parsed
+        region_id = tag.get("id")
+        if region_id is not None:
+            regions[region_id] = (tag.get("name") or {}).get("value") or ""
+    # Segunda passada sobre counts ja materializado monta as competicoes direto, sem lista intermediaria.
+    return [
+        {
+            "competitionId": comp["id"],
+            "compoundId": comp.get("compoundId") or f"{comp.get('sportId')}:{comp['id']}",
+            "regionId": comp["parentId"],
+            "regionName": regions.get(comp["parentId"], ""),
+            "competitionName": (comp.get("name") or {}).get("value") or "",
+        }
+        for comp in (item.get("tag") for item in counts)
+        if comp
+        and comp.get("type") == "Competition"
+        and comp.get("id") is not None
+        and comp.get("parentId") is not None
+    ]
 
 
 def extract_fixtures_from_widget(widget_payload: dict) -> list[dict]:
     fixtures: list[dict] = []
-
-    def walk(node: Any) -> None:
+    # Pilha explícita (sem recursão); tuplas marcam listas "fixtures" a emitir na posição original,
+    # preservando a mesma ordem da busca em profundidade anterior. JSON nunca produz tuplas.
+    stack: list[Any] = [widget_payload]
+    pop = stack.pop
+    push = stack.append
+    while stack:
+        node = pop()
         if isinstance(node, dict):
-            for key, value in node.items():
+            for key, value in reversed(node.items()):
                 if key == "fixtures" and isinstance(value, list):
-                    fixtures.extend([item for item in value if isinstance(item, dict)])
-                else:
-                    walk(value)
+                    push((value,))
+                elif isinstance(value, (dict, list)):
+                    push(value)
         elif isinstance(node, list):
-            for item in node:
-                walk(item)
-
-    walk(widget_payload)
+            stack.extend(item for item in reversed(node) if isinstance(item, (dict, list)))
+        elif isinstance(node, tuple):
+            fixtures.extend(item for item in node[0] if isinstance(item, dict))
     return fixtures
 
 
-def fetch_competition_fixtures(session: requests.Session, competition: dict, args: argparse.Namespace) -> list[dict]:
+def fetch_competition_fixtures(
+    session: requests.Session, competition: dict, args: argparse.Namespace, limiter: RateLimiter | None = None
+) -> list[dict]:
     params = {
         "layoutSize": "Large",
         "page": "CompetitionLobby",
@@ -241,9 +267,9 @@ def fetch_competition_fixtures(session: requests.Session, competition: dict, arg
         "widgetId": "/mobilesports-v1.0/layout/layout_standards/modules/competition/defaultcontainer",
         "shouldIncludePayload": "true",
     }
-    headers = dict(COMMON_HEADERS)
-    headers.update(SPORTS_HEADERS)
-    resp = session.get(WIDGET_ENDPOINT, params=params, headers=headers, timeout=args.timeout)
+    if limiter is not None:
+        limiter.acquire()
+    resp = session.get(WIDGET_ENDPOINT, params=params, headers=SPORTS_FULL_HEADERS, timeout=args.timeout)
     if resp.status_code != 200:
         logging.warning(
             "Competition %s (%s) retornou status %s",
@@ -252,30 +278,39 @@ def fetch_competition_fixtures(session: requests.Session, competition: dict, arg
             resp.status_code,
         )
         return []
-    payload = resp.json()
+    payload = loads_json(resp.content)
     fixtures = extract_fixtures_from_widget(payload)
+    annotations = {
+        "_regionId": competition["regionId"],
+        "_regionName": competition["regionName"],
+        "_competitionId": competition["competitionId"],
+        "_competitionName": competition["competitionName"],
+    }
     for fx in fixtures:
-        fx["_regionId"] = competition["regionId"]
-        fx["_regionName"] = competition["regionName"]
-        fx["_competitionId"] = competition["competitionId"]
-        fx["_competitionName"] = competition["competitionName"]
+        fx.update(annotations)
     return fixtures
 
 
 def dedupe_fixtures(fixtures: Iterable[dict]) -> list[dict]:
-    seen: dict[str, dict] = {}
+    seen: set[str] = set()
+    mark_seen = seen.add
+    deduped: list[dict] = []
     for fx in fixtures:
         fixture_id = str(fx.get("id") or fx.get("fixtureId") or "")
-        if not fixture_id:
+        if not fixture_id or fixture_id in seen:
             continue
-        if fixture_id not in seen:
-            seen[fixture_id] = fx
-    return list(seen.values())
+        mark_seen(fixture_id)
+        deduped.append(fx)
+    return deduped
 
 
 def parse_start(value: str | None) -> datetime | None:
     if not value:
         return None
+    # Formato da API (YYYY-MM-DDTHH:MM:SSZ) sem passar pelo fromisoformat.
+    parsed = parse_utc_z(value) if isinstance(value, str) else None
+    if parsed is not None:
+        return parsed
     try:
         clean = value.strip()
         if clean.endswith("Z"):
@@ -310,6 +345,52 @@ def filter_fixtures_by_date(fixtures: list[dict], hours: float, allow_past: bool
     return kept
 
 
+def _contains_boost(obj: Any) -> bool:
+    """Procura "boost" em chaves/valores textuais, equivalente a buscar no JSON serializado."""
+    if isinstance(obj, str):
+        return "boost" in obj.lower()
+    if isinstance(obj, dict):
+        # Atalho: a chave boostedPrice (mesmo nula) já contém "boost".
+        if "boostedPrice" in obj:
+            return True
+        for key, value in obj.items():
+            if isinstance(key, str) and "boost" in key.lower():
+                return True
+            if _contains_boost(value):
+                return True
+        return False
+    if isinstance(obj, list):
+        return any(_contains_boost(item) for item in obj)
+    return False
+
+
+# Campos mantidos pela poda; chaves ausentes entram como None para preservar o formato gravado.
+_FIXTURE_KEYS = (
+    "id",
+    "sourceId",
+    "name",
+    "fixtureType",
+    "context",
+    "startDate",
+    "cutOffDate",
+    "sport",
+    "competition",
+    "region",
+    "participants",
+    "scoreboard",
+    "totalMarketsCount",
+    "priceBoostCount",
+    "addons",
+    "marketGroups",
+    "optionMarkets",
+)
+_PARTICIPANT_KEYS = ("id", "participantId", "name", "status", "image", "properties")
+
+
+def _text_value(value: Any) -> Any:
+    return value.get("value") if isinstance(value, dict) else value
+
+
 def prune_fixture_raw(raw: dict | Any) -> dict | Any:
     """
     Poda o payload mantendo mercados relevantes e campos que sinalizam promo (boost) e VP+2.
@@ -321,29 +402,22 @@ def prune_fixture_raw(raw: dict | Any) -> dict | Any:
         return raw
 
     def _market_params(market: dict) -> dict:
-        params: dict[str, Any] = {}
-        for item in market.get("parameters") or []:
-            key = item.get("key")
-            if key:
-                params[key] = item.get("value")
-        return params
-
-    def _has_boost(market: dict) -> bool:
-        if any("boost" in json.dumps(opt, ensure_ascii=False).lower() for opt in market.get("options") or []):
+        return {item["key"]: item.get("value") for item in market.get("parameters") or () if item.get("key")}
+
+    def _has_boost(market: dict, params: dict) -> bool:
+        if any(_contains_boost(opt) for opt in market.get("options") or []):
             return True
-        params = _market_params(market)
         subtype = (params.get("MarketSubType") or "").strip()
         if subtype in PROMO_MARKET_SUBTYPES:
             return True
         return False
 
-    def _should_keep_market(market: dict) -> bool:
-        params = _market_params(market)
+    def _should_keep_market(market: dict, params: dict) -> bool:
         mtype = params.get("MarketType") or ""
         period = params.get("Period")
         subtype = params.get("MarketSubType") or ""
         # Mantem se for promo/boost (ex: VP+2 usa MarketSubType 2Up3wayPricing)
-        if _has_boost(market):
+        if _has_boost(market, params):
             return True
         if subtype in PROMO_MARKET_SUBTYPES:
             return True
@@ -358,105 +432,85 @@ def prune_fixture_raw(raw: dict | Any) -> dict | Any:
             return False
         return True
 
-    def _slim_options(market: dict) -> list[dict]:
-        slimmed: list[dict] = []
-        for opt in market.get("options") or []:
-            price = opt.get("price") or {}
-            slimmed.append(
-                {
-                    "id": opt.get("id"),
-                    "name": (opt.get("name") or {}).get("value") if isinstance(opt.get("name"), dict) else opt.get("name"),
-                    "status": opt.get("status"),
-                    "code": opt.get("code"),
-                    "price": price,
-                    "boostedPrice": opt.get("boostedPrice"),
-                }
-            )
-        return slimmed
+    def _slim_option(opt: dict) -> dict:
+        return {
+            "id": opt.get("id"),
+            "name": _text_value(opt.get("name")),
+            "status": opt.get("status"),
+            "code": opt.get("code"),
+            "price": opt.get("price") or {},
+            # Mantem boostedPrice para identificar cotas aumentadas / VP+2 (MarketSubType 2Up3wayPricing).
+            "boostedPrice": opt.get("boostedPrice"),
+        }
 
-    def _slim_market(market: dict) -> dict:
-        params = _market_params(market)
+    def _slim_market(market: dict, params: dict) -> dict:
+        # Copia so os campos mantidos: o payload de entrada segue intacto e a poda pode ser refeita.
         return {
             "id": market.get("id"),
-            "name": (market.get("name") or {}).get("value") if isinstance(market.get("name"), dict) else market.get("name"),
+            "name": _text_value(market.get("name")),
             "status": market.get("status"),
             "parameters": params,
-            # Mantem boostedPrice para identificar cotas aumentadas / VP+2 (MarketSubType 2Up3wayPricing).
-            "options": _slim_options(market),
+            "options": [_slim_option(opt) for opt in market.get("options") or []],
         }
 
-    option_markets = fixture.get("optionMarkets") or []
-    filtered_markets = [_slim_market(m) for m in option_markets if _should_keep_market(m)]
+    # Parametros de cada mercado calculados uma unica vez e reaproveitados no filtro e no slim.
+    markets_with_params = [(m, _market_params(m)) for m in fixture.get("optionMarkets") or []]
+    kept = [(m, p) for m, p in markets_with_params if _should_keep_market(m, p)]
     # Se nada passou no filtro, mantemos todos os mercados (ainda slim) para não perder referência.
-    if not filtered_markets:
-        filtered_markets = [_slim_market(m) for m in option_markets]
-
-    participants: list[dict] = []
-    for item in fixture.get("participants") or []:
-        p_type = (item.get("properties") or {}).get("type")
-        if p_type in TEAM_PARTICIPANT_TYPES:
-            participants.append(
-                {
-                    "id": item.get("id"),
-                    "participantId": item.get("participantId"),
-                    "name": item.get("name"),
-                    "status": item.get("status"),
-                    "image": item.get("image"),
-                    "properties": item.get("properties"),
-                }
-            )
+    filtered_markets = [_slim_market(m, p) for m, p in kept or markets_with_params]
 
-    slim_fixture = {
-        "id": fixture.get("id"),
-        "sourceId": fixture.get("sourceId"),
-        "name": fixture.get("name"),
-        "fixtureType": fixture.get("fixtureType"),
-        "context": fixture.get("context"),
-        "startDate": fixture.get("startDate"),
-        "cutOffDate": fixture.get("cutOffDate"),
-        "sport": fixture.get("sport"),
-        "competition": fixture.get("competition"),
-        "region": fixture.get("region"),
-        "participants": participants,
-        "scoreboard": fixture.get("scoreboard"),
-        "totalMarketsCount": fixture.get("totalMarketsCount"),
-        "priceBoostCount": fixture.get("priceBoostCount"),
-        "addons": fixture.get("addons"),
-        "marketGroups": fixture.get("marketGroups"),
-        "optionMarkets": filtered_markets,
-    }
+    participants = [
+        {key: item.get(key) for key in _PARTICIPANT_KEYS}
+        for item in fixture.get("participants") or []
+        if (item.get("properties") or {}).get("type") in TEAM_PARTICIPANT_TYPES
+    ]
+
+    slim_fixture = {key: fixture.get(key) for key in _FIXTURE_KEYS}
+    slim_fixture["participants"] = participants
+    slim_fixture["optionMarkets"] = filtered_markets
     return {"fixture": slim_fixture}
 
 
-def is_valid_fixture(fixture: dict | Any) -> bool:
+def _cheap_valid(fixture: dict | Any) -> bool:
+    """Checagens que a poda nao altera; rodam no fixture bruto para evitar podar o que sera descartado."""
+    # Da mais barata para a mais cara, saindo na primeira reprovacao.
     if not isinstance(fixture, dict):
         return False
+    fixture_type = (fixture.get("fixtureType") or "").lower()
+    if fixture_type and fixture_type != "pairgame":
+        return False
+    if not fixture.get("optionMarkets"):
+        return False
     sport_id = (
         (fixture.get("sport") or {}).get("id")
         or (fixture.get("scoreboard") or {}).get("sportId")
     )
     if sport_id and sport_id != SPORT_ID:
         return False
-    participants = fixture.get("participants") or []
-    if sum(1 for _ in participants if isinstance(_, dict)) < 2:
-        return False
-    option_markets = fixture.get("optionMarkets") or []
-    if not option_markets:
-        return False
     comp_name = ((fixture.get("competition") or {}).get("name") or {}).get("value") or ""
     comp_name_lower = comp_name.lower()
-    if "múltiplas" in comp_name_lower or "multipla" in comp_name_lower:
-        return False
-    fixture_type = (fixture.get("fixtureType") or "").lower()
-    if fixture_type and fixture_type != "pairgame":
+    # "múltipla" cobre também "múltiplas".
+    if "múltipla" in comp_name_lower or "multipla" in comp_name_lower:
         return False
     return True
 
 
-def fetch_fixture_detail(
-    session: requests.Session | None, fixture_id: str, access_id: str, timeout: float
-) -> dict | None:
-    session = session or _session()
+def _final_valid(fixture: dict) -> bool:
+    """Exige ao menos dois participantes; apos a poda so restam os do tipo time."""
+    teams = 0
+    for participant in fixture.get("participants") or ():
+        if isinstance(participant, dict):
+            teams += 1
+            if teams >= 2:
+                return True
+    return False
+
+
+def is_valid_fixture(fixture: dict | Any) -> bool:
+    return _cheap_valid(fixture) and _final_valid(fixture)
+
+
+def fetch_fixture_detail(session: requests.Session, fixture_id: str, access_id: str, timeout: float) -> dict | None:
     params = {
         "x-bwin-accessid": access_id,
         "lang": "pt-br",
@@ -473,22 +527,18 @@ def fetch_fixture_detail(
         "includeRelatedFixtures": "false",
         "statisticsModes": "None",
     }
-    headers = dict(COMMON_HEADERS)
-    headers.update(CDS_HEADERS)
-    for attempt in range(1, 4):
-        try:
-            resp = session.get(FIXTURE_ENDPOINT, params=params, headers=headers, timeout=timeout)
-            if resp.status_code == 200:
-                payload = resp.json()
-                if isinstance(payload, dict) and payload.get("fixture"):
-                    return payload
-                logging.warning("Fixture %s sem campo fixture (tentativa %s)", fixture_id, attempt)
-            else:
-                logging.warning("Status %s ao detalhar fixture %s (tentativa %s)", resp.status_code, fixture_id, attempt)
-        except requests.RequestException as exc:
-            logging.warning("Erro ao detalhar fixture %s (tentativa %s): %s", fixture_id, attempt, exc)
-        if attempt < 3:
-            time.sleep(0.5 * attempt)
+    try:
+        resp = session.get(FIXTURE_ENDPOINT, params=params, headers=CDS_FULL_HEADERS, timeout=timeout)
+        if resp.status_code != 200:
+            logging.warning("Status %s ao detalhar fixture %s", resp.status_code, fixture_id)
+            return None
+        payload = loads_json(resp.content)
+    except (requests.RequestException, ValueError) as exc:
+        logging.warning("Erro ao detalhar fixture %s: %s", fixture_id, exc)
+        return None
+    if isinstance(payload, dict) and payload.get("fixture"):
+        return payload
+    logging.warning("Fixture %s sem campo fixture", fixture_id)
     return None
 
 
@@ -497,11 +547,14 @@ def enrich_fixtures(
     access_id: str,
     timeout: float,
     max_workers: int = DEFAULT_MAX_WORKERS,
+    session: requests.Session | None = None,
 ) -> Iterable[dict]:
     if not fixtures:
         return []
     max_workers = max(1, min(max_workers, MAX_WORKERS_CAP))
-    session = _session()
+    # Uma sessão (um pool de conexões) compartilhada por todos os workers: requests.Session é
+    # seguro para GETs concorrentes e assim as conexões TLS abertas são reaproveitadas entre threads.
+    session = session or build_session()
     if max_workers == 1:
         for fx in fixtures:
             fixture_id = str(fx.get("id") or fx.get("fixtureId") or "")
@@ -517,23 +570,29 @@ def enrich_fixtures(
             fixture_id = str(fx.get("id") or fx.get("fixtureId") or "")
             if not fixture_id:
                 continue
-            future = executor.submit(fetch_fixture_detail, None, fixture_id, access_id, timeout)
+            future = executor.submit(fetch_fixture_detail, session, fixture_id, access_id, timeout)
             future_map[future] = fx
-        for future in as_completed(future_map):
-            fx = future_map[future]
-            try:
-                detail = future.result()
-            except Exception as exc:  # pragma: no cover - protecao runtime
-                logging.warning("Detalhe falhou para fixture %s: %s", fx.get("id"), exc)
-                detail = None
-            if detail:
-                fx["raw"] = detail
-            yield fx
-
-
-def save_raw(fixtures: list[dict], args: argparse.Namespace, client: MongoClient | None = None, collection=None) -> None:
+        try:
+            for future in as_completed(future_map):
+                fx = future_map[future]
+                try:
+                    detail = future.result()
+                except Exception as exc:  # pragma: no cover - protecao runtime
+                    logging.warning("Detalhe falhou para fixture %s: %s", fx.get("id"), exc)
+                    detail = None
+                if detail:
+                    fx["raw"] = detail
+                yield fx
+        finally:
+            # Se o consumidor parar antes do fim, descarta os detalhes ainda na fila do executor;
+            # sem isso a saida do with aguardaria todas as requisicoes ja submetidas.
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+def save_raw(fixtures: list[dict], args: argparse.Namespace, client: MongoClient | None = None, collection=None) -> int:
+    """Grava o lote e retorna quantos documentos foram enviados ao Mongo."""
     if not fixtures:
-        return
+        return 0
     close_client = False
     if collection is None:
         if client is None:
@@ -541,32 +600,44 @@ def save_raw(fixtures: list[dict], args: argparse.Namespace, client: MongoClient
             close_client = True
         collection = client[args.mongo_db][args.mongo_collection]
     operations: list[ReplaceOne] = []
+    append = operations.append
+    replace_one = ReplaceOne
     captured_at = datetime.utcnow()
     skipped_invalid = 0
     for fx in fixtures:
-        fixture_id = str(fx.get("id") or fx.get("fixtureId") or "")
+        fx_get = fx.get
+        fixture_id = str(fx_get("id") or fx_get("fixtureId") or "")
         if not fixture_id:
             continue
-        raw = fx.get("raw") or fx
+        raw = fx_get("raw") or fx
+        # Descarta antes de podar: tipo, mercados, esporte e competicao nao mudam com a poda.
+        if not _cheap_valid(raw.get("fixture") if type(raw) is dict else None):
+            skipped_invalid += 1
+            continue
         raw = prune_fixture_raw(raw)
-        fixture_block = raw.get("fixture", {}) if isinstance(raw, dict) else {}
-        if not is_valid_fixture(fixture_block):
+        fixture_block = raw["fixture"]
+        if not _final_valid(fixture_block):
             skipped_invalid += 1
             continue
-        doc = {
-            "eventId": fixture_id,
-            "source": "sportingbet",
-            "capturedAt": captured_at,
-            "regionId": fx.get("_regionId"),
-            "regionName": fx.get("_regionName"),
-            "competitionId": fx.get("_competitionId"),
-            "competitionName": fx.get("_competitionName"),
-            "startDate": fixture_block.get("startDate") if isinstance(fixture_block, dict) else fx.get("startDate"),
-            "raw": raw,
-        }
-        operations.append(ReplaceOne({"eventId": fixture_id}, doc, upsert=True))
+        append(
+            replace_one(
+                {"eventId": fixture_id},
+                {
+                    "eventId": fixture_id,
+                    "source": "sportingbet",
+                    "capturedAt": captured_at,
+                    "regionId": fx_get("_regionId"),
+                    "regionName": fx_get("_regionName"),
+                    "competitionId": fx_get("_competitionId"),
+                    "competitionName": fx_get("_competitionName"),
+                    "startDate": fixture_block.get("startDate"),
+                    "raw": raw,
+                },
+                upsert=True,
+            )
+        )
     if operations:
-        result = collection.bulk_write(operations, ordered=False)
+        result = collection.bulk_write(operations, ordered=False, bypass_document_validation=True)
         logging.info(
             "Dump salvo em %s.%s (upserted=%s, modified=%s)",
             args.mongo_db,
@@ -578,6 +649,7 @@ def save_raw(fixtures: list[dict], args: argparse.Namespace, client: MongoClient
         logging.info("Fixtures descartados por falta de mercados/participantes ou tipo invalido: %s", skipped_invalid)
     if close_client and client:
         client.close()
+    return len(operations)
 
 
 def main(argv: Sequence[str] | None = None) -> None:
@@ -591,12 +663,18 @@ def main(argv: Sequence[str] | None = None) -> None:
     logging.info("Competicoes encontradas: %s", len(competitions))
 
     all_fixtures: list[dict] = []
-    for idx, comp in enumerate(competitions, 1):
-        fixtures = fetch_competition_fixtures(session, comp, args)
-        all_fixtures.extend(fixtures)
-        if idx % 10 == 0 or idx == len(competitions):
-            logging.info("... %s/%s competicoes processadas (%s fixtures ate agora)", idx, len(competitions), len(all_fixtures))
-        time.sleep(0.05)
+    # Competicoes sao independentes: busca em paralelo na mesma sessao; map preserva a ordem original.
+    comp_workers = max(1, min(args.max_workers, MAX_WORKERS_CAP))
+    # So espera quando o ritmo somado passa de --max-rps; respostas lentas nao pagam atraso extra.
+    limiter = RateLimiter(args.max_rps)
+    with ThreadPoolExecutor(max_workers=comp_workers, thread_name_prefix="sportingbet-comp") as executor:
+        results = executor.map(lambda comp: fetch_competition_fixtures(session, comp, args, limiter), competitions)
+        for idx, fixtures in enumerate(results, 1):
+            all_fixtures.extend(fixtures)
+            if idx % 10 == 0 or idx == len(competitions):
+                logging.info(
+                    "... %s/%s competicoes processadas (%s fixtures ate agora)", idx, len(competitions), len(all_fixtures)
+                )
 
     fixtures = dedupe_fixtures(all_fixtures)
     logging.info("Fixtures unicas apos dedupe: %s", len(fixtures))
@@ -607,30 +685,44 @@ def main(argv: Sequence[str] | None = None) -> None:
 
     mongo_client = MongoClient(args.mongo_uri)
     collection = mongo_client[args.mongo_db][args.mongo_collection]
+    # Cada ReplaceOne filtra por eventId; o indice unico evita varrer a colecao a cada upsert.
+    collection.create_index("eventId", unique=True)
+
+    json_file = None
+    if args.json:
+        args.json.parent.mkdir(parents=True, exist_ok=True)
+        json_file = args.json.open("wb")
+
+    # No maximo 2 lotes aguardando gravacao enquanto o enriquecimento segue.
+    writer = BatchWriter(
+        partial(save_raw, args=args, client=mongo_client, collection=collection),
+        maxsize=2,
+        name="sportingbet-writer",
+    ).start()
 
     buffer: list[dict] = []
-    enriched_all: list[dict] = []
-    for fx in enrich_fixtures(fixtures, args.access_id, args.timeout, args.max_workers):
-        enriched_all.append(fx)
-        buffer.append(fx)
-        if len(buffer) >= max(1, args.flush_size):
-            save_raw(buffer, args, client=mongo_client, collection=collection)
-            buffer.clear()
-    if buffer:
-        save_raw(buffer, args, client=mongo_client, collection=collection)
+    try:
+        for fx in enrich_fixtures(fixtures, args.access_id, args.timeout, args.max_workers, session):
+            if writer.error is not None:
+                # Mongo ja falhou: nao adianta seguir detalhando fixtures que nao serao gravados.
+                break
+            # Escrita incremental: nenhum acumulador com todos os fixtures fica em memoria.
+            if json_file is not None:
+                json_file.write(dumps_json_line(fx))
+            buffer.append(fx)
+            if len(buffer) >= max(1, args.flush_size):
+                writer.put(buffer)
+                buffer = []
+        if buffer:
+            writer.put(buffer)
+    finally:
+        writer.close()
+        if json_file is not None:
+            json_file.close()
     mongo_client.close()
-    logging.info("Eventos persistidos no Mongo: %s", len(enriched_all))
-
+    logging.info("Eventos persistidos no Mongo: %s", writer.saved)
+    writer.raise_if_failed()
     if args.json:
-        args.json.parent.mkdir(parents=True, exist_ok=True)
-        args.json.write_text(
-            json.dumps(
-                {"scraped_at": datetime.utcnow().isoformat(), "events": enriched_all},
-                ensure_ascii=False,
-                indent=2,
-            ),
-            encoding="utf-8",
-        )
         logging.info("Dump salvo em %s", args.json)
     logging.info("Concluido.")
 
@@ -4,24 +4,29 @@
 from __future__ import annotations
 
 import argparse
-import json
 import logging
-import re
+import random
 import sys
 import threading
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import datetime, timezone, timedelta
+from functools import lru_cache, partial
 from pathlib import Path
 from typing import Sequence
+from urllib.parse import urlencode
 
+from bson.codec_options import CodecOptions
 import requests
-from pymongo import MongoClient, ReplaceOne
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from pymongo import MongoClient, ReplaceOne, WriteConcern
 
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.append(str(PROJECT_ROOT))
 
+from commons.scraper_utils import BatchWriter, dumps_json_line, loads_json, parse_utc_z
 from superbet import superbet_scraper as superbet_mod
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
@@ -44,11 +49,31 @@ DEFAULT_MARKET_IDS = [
     557,  # Resultado Final & Total de Gols
 ]
 EVENT_DETAILS_PARAMS = {"includeMarkets": ",".join(str(market_id) for market_id in DEFAULT_MARKET_IDS)}
-ALLOWED_MARKET_IDS: list[int] | None = DEFAULT_MARKET_IDS
+ALLOWED_MARKETS_SET: frozenset[int] | None = frozenset(DEFAULT_MARKET_IDS)
+# --verify-server-filter: apenas contabiliza odds fora de includeMarkets; o filtro local sempre roda.
+VERIFY_SERVER_FILTER = False
+_SERVER_FILTER_LOCK = threading.Lock()
+_SERVER_FILTER_STATS = {"events": 0, "extra_odds": 0}
 DEFAULT_MAX_WORKERS = 8
-MAX_WORKERS_CAP = 12
-DEFAULT_FLUSH_BATCH = 200
-_THREAD_LOCAL = threading.local()
+# Detalhamento e puro I/O de rede: threads passam quase todo o tempo esperando resposta, fora do GIL.
+MAX_WORKERS_CAP = 32
+# Backoff exponencial com jitter entre tentativas de detalhe (segundos).
+RETRY_BACKOFF_BASE = 0.25
+RETRY_BACKOFF_CAP = 4.0
+# Teto para o Retry-After do servidor e orçamento total de espera por evento (segundos).
+RETRY_AFTER_CAP = 10.0
+RETRY_TOTAL_WAIT_CAP = 15.0
+# Campos copiados de cada odd na poda; os opcionais so entram quando existem no payload.
+_ODD_KEYS = ("marketId", "marketName", "outcomeId", "name", "code", "price", "status")
+_ODD_OPTIONAL_KEYS = ("offerStateId", "marketGroupOrder")
+# --include-markets aceita "," ou ";" como separador.
+_SEMICOLON_TO_COMMA = str.maketrans(";", ",")
+DEFAULT_FLUSH_BATCH = 1000
+BULK_WRITE_CHUNK = 1000
+# Dump bruto e regravado a cada coleta: basta o ack do primario, sem esperar o journal.
+RAW_WRITE_CONCERN = WriteConcern(w=1, j=False)
+# capturedAt já nasce em UTC com tzinfo; a coleção lê e grava datas tz-aware.
+RAW_CODEC_OPTIONS = CodecOptions(tz_aware=True, tzinfo=timezone.utc)
 
 
 def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
@@ -61,7 +86,11 @@ def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
         default=DEFAULT_MONGO_COLLECTION,
         help="Coleção onde o dump bruto será salvo",
     )
-    parser.add_argument("--json", type=Path, help="Arquivo opcional para salvar todos os eventos coletados")
+    parser.add_argument(
+        "--json",
+        type=Path,
+        help="Arquivo opcional (JSON Lines, um evento por linha) gravado à medida que os eventos são enriquecidos",
+    )
     parser.add_argument(
         "--allow-past",
         action="store_true",
@@ -86,127 +115,188 @@ def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
             "(use 'all' para manter o comportamento antigo)."
         ),
     )
+    parser.add_argument(
+        "--verify-server-filter",
+        action="store_true",
+        help="Registra quantas odds a API devolve fora de includeMarkets (o filtro local continua ativo)",
+    )
     return parser.parse_args(argv)
 
 
-def build_event_params(include_markets_arg: str | None) -> tuple[dict[str, str], list[int] | None]:
+def build_event_params(include_markets_arg: str | None) -> tuple[dict[str, str], frozenset[int] | None]:
     """Retorna o dicion�rio de query params para detalhar eventos e a lista de IDs para poda local."""
     if include_markets_arg:
         value = include_markets_arg.strip()
         if value:
             if value.lower() == "all":
                 return {"includeMarkets": "all"}, None
-            tokens = [token.strip() for token in re.split(r"[;,]", value) if token.strip()]
+            tokens = [token.strip() for token in value.translate(_SEMICOLON_TO_COMMA).split(",") if token.strip()]
             if tokens:
-                return {"includeMarkets": ",".join(tokens)}, [int(tok) for tok in tokens if tok.isdigit()]
-    return {"includeMarkets": ",".join(str(market_id) for market_id in DEFAULT_MARKET_IDS)}, DEFAULT_MARKET_IDS
+                return {"includeMarkets": ",".join(tokens)}, frozenset(int(tok) for tok in tokens if tok.isdigit())
+    return {"includeMarkets": ",".join(str(market_id) for market_id in DEFAULT_MARKET_IDS)}, frozenset(DEFAULT_MARKET_IDS)
+
 
+def build_detail_url_template(params: dict[str, str]) -> str:
+    """Monta uma vez a URL de detalhe com a query já codificada; só falta o event_id."""
+    return f"{superbet_mod.BASE_URL}/v2/pt-BR/events/{{}}?{urlencode(params)}"
 
-def prune_event_raw(raw_event: dict, allowed_markets: list[int]) -> dict:
-    """Remove mercados desnecessários e campos pesados para reduzir tamanho em disco/memória."""
+
+DETAIL_URL_TEMPLATE = build_detail_url_template(EVENT_DETAILS_PARAMS)
+
+
+def prune_event_raw(raw_event: dict, allowed_markets: frozenset[int]) -> dict:
+    """Remove mercados desnecessários e campos pesados para reduzir tamanho em disco/memória.
+
+    Altera `raw_event` no lugar: o único chamador (fetch_full_event) é dono do dict recém-decodificado.
+    """
     # Remove bloco markets duplicado
-    raw_event = dict(raw_event)
     raw_event.pop("markets", None)
     odds = raw_event.get("odds") or []
     filtered_odds = []
     for odd in odds:
         if odd.get("marketId") not in allowed_markets:
             continue
-        slim = {
-            "marketId": odd.get("marketId"),
-            "marketName": odd.get("marketName"),
-            "outcomeId": odd.get("outcomeId"),
-            "name": odd.get("name"),
-            "code": odd.get("code"),
-            "price": odd.get("price"),
-            "status": odd.get("status"),
-        }
+        slim = {key: odd.get(key) for key in _ODD_KEYS}
         # Mantém offerStateId e marketGroupOrder para ordenação/estado.
-        if "offerStateId" in odd:
-            slim["offerStateId"] = odd.get("offerStateId")
-        if "marketGroupOrder" in odd:
-            slim["marketGroupOrder"] = odd.get("marketGroupOrder")
+        for key in _ODD_OPTIONAL_KEYS:
+            if key in odd:
+                slim[key] = odd[key]
         filtered_odds.append(slim)
     raw_event["odds"] = filtered_odds
     return raw_event
 
 
+def _build_doc(event: dict, captured_at: datetime) -> dict | None:
+    """Monta o documento bruto do Mongo; `raw` referencia o payload do evento, sem cópia."""
+    raw_event = event.get("raw") or event
+    event_id = raw_event.get("eventId") or event.get("event_id")
+    if not event_id:
+        return None
+    return {
+        "eventId": str(event_id),
+        "matchName": raw_event.get("matchName") or raw_event.get("name"),
+        "sportId": raw_event.get("sportId") or event.get("sport_id"),
+        "tournamentId": raw_event.get("tournamentId") or event.get("tournament_id"),
+        "capturedAt": captured_at,
+        "source": "superbet",
+        "raw": raw_event,
+    }
+
+
 def save_raw_events(
     events: list[dict],
     args: argparse.Namespace,
     client: MongoClient | None = None,
     collection=None,
-) -> None:
+) -> int:
+    """Grava o lote e retorna quantos documentos foram enviados ao Mongo."""
     if not events:
         logging.warning("Nenhum evento bruto para salvar")
-        return
+        return 0
     close_client = False
     if collection is None:
         if client is None:
             client = MongoClient(args.mongo_uri)
             close_client = True
-        collection = client[args.mongo_db][args.mongo_collection]
+        collection = client[args.mongo_db][args.mongo_collection].with_options(
+            codec_options=RAW_CODEC_OPTIONS, write_concern=RAW_WRITE_CONCERN
+        )
     operations: list[ReplaceOne] = []
-    captured_at = datetime.utcnow()
+    captured_at = datetime.now(timezone.utc)
+    append = operations.append
     for event in events:
-        raw_event = dict(event.get("raw") or event)
-        event_id = raw_event.get("eventId") or event.get("event_id")
-        if not event_id:
-            continue
-        doc = {
-            "eventId": str(event_id),
-            "matchName": raw_event.get("matchName") or raw_event.get("name"),
-            "sportId": raw_event.get("sportId") or event.get("sport_id"),
-            "tournamentId": raw_event.get("tournamentId") or event.get("tournament_id"),
-            "capturedAt": captured_at,
-            "source": "superbet",
-            "raw": raw_event,
-        }
-        operations.append(ReplaceOne({"eventId": doc["eventId"]}, doc, upsert=True))
+        doc = _build_doc(event, captured_at)
+        if doc is not None:
+            append(ReplaceOne({"eventId": doc["eventId"]}, doc, upsert=True))
     if operations:
-        result = collection.bulk_write(operations, ordered=False)
+        upserted = modified = 0
+        # Blocos de ate BULK_WRITE_CHUNK operacoes, desordenados para o servidor aplicar em paralelo.
+        for start in range(0, len(operations), BULK_WRITE_CHUNK):
+            result = collection.bulk_write(
+                operations[start : start + BULK_WRITE_CHUNK], ordered=False, bypass_document_validation=True
+            )
+            upserted += result.upserted_count
+            modified += result.modified_count
         logging.info(
             "Dump salvo em %s.%s (upserted=%s, modified=%s)",
             args.mongo_db,
             args.mongo_collection,
-            result.upserted_count,
-            result.modified_count,
+            upserted,
+            modified,
         )
     if close_client and client:
         client.close()
+    return len(operations)
 
 
-def _thread_session() -> requests.Session:
-    session = getattr(_THREAD_LOCAL, "session", None)
-    if session is None:
-        session = requests.Session()
-        session.headers.update(superbet_mod.HEADERS)
-        _THREAD_LOCAL.session = session
+def build_session() -> requests.Session:
+    session = requests.Session()
+    session.headers.update(superbet_mod.HEADERS)
+    # Um unico pool para todos os workers: conexoes keep-alive e TLS reaproveitados entre threads.
+    # Sem retry no adapter; fetch_full_event ja controla as tentativas.
+    adapter = HTTPAdapter(
+        pool_connections=MAX_WORKERS_CAP, pool_maxsize=MAX_WORKERS_CAP, pool_block=False, max_retries=Retry(total=0)
+    )
+    session.mount("https://", adapter)
     return session
 
 
+GLOBAL_SESSION = build_session()
+
+
+def _record_server_filter(raw_event: dict) -> None:
+    """Conta odds que a API devolveu fora de includeMarkets (diagnóstico, não altera a poda)."""
+    extra = sum(1 for odd in raw_event.get("odds") or () if odd.get("marketId") not in ALLOWED_MARKETS_SET)
+    with _SERVER_FILTER_LOCK:
+        _SERVER_FILTER_STATS["events"] += 1
+        _SERVER_FILTER_STATS["extra_odds"] += extra
+
+
+def _retry_delay(attempt: int, resp: requests.Response | None) -> float:
+    """Usa o Retry-After de 429/503 quando numérico (limitado a RETRY_AFTER_CAP); senão backoff com jitter."""
+    if resp is not None and resp.status_code in (429, 503):
+        try:
+            retry_after = float(resp.headers.get("Retry-After"))
+        except (TypeError, ValueError):
+            retry_after = -1.0
+        if retry_after >= 0:
+            return min(retry_after, RETRY_AFTER_CAP)
+    # Jitter evita que todos os workers acordem juntos durante uma instabilidade.
+    return min(RETRY_BACKOFF_CAP, RETRY_BACKOFF_BASE * 2 ** (attempt - 1)) * random.uniform(0.5, 1.0)
+
+
 def fetch_full_event(session: requests.Session | None, event_id: str, retries: int = 3) -> dict | None:
     """Busca o payload completo (todos os mercados) de um evento específico."""
-    url = f"{superbet_mod.BASE_URL}/v2/pt-BR/events/{event_id}"
+    url = DETAIL_URL_TEMPLATE.format(event_id)
+    waited = 0.0
     for attempt in range(1, retries + 1):
+        resp = None
         try:
-            request_session = session or _thread_session()
-            resp = request_session.get(url, params=EVENT_DETAILS_PARAMS, timeout=20)
+            resp = (session or GLOBAL_SESSION).get(url, timeout=20)
             if resp.status_code == 200:
-                payload = resp.json()
+                payload = loads_json(resp.content)
                 data = payload.get("data")
                 if data:
                     raw_event = data[0]
-                    if ALLOWED_MARKET_IDS:
-                        raw_event = prune_event_raw(raw_event, ALLOWED_MARKET_IDS)
+                    if ALLOWED_MARKETS_SET:
+                        if VERIFY_SERVER_FILTER:
+                            _record_server_filter(raw_event)
+                        raw_event = prune_event_raw(raw_event, ALLOWED_MARKETS_SET)
                     return raw_event
                 logging.warning("Evento %s sem campo 'data' no detalhe", event_id)
             else:
                 logging.warning("Falha %s ao detalhar evento %s", resp.status_code, event_id)
-        except requests.RequestException as exc:
+        except (requests.RequestException, ValueError) as exc:
             logging.warning("Erro ao detalhar evento %s (tentativa %s/%s): %s", event_id, attempt, retries, exc)
         if attempt < retries:
-            time.sleep(0.5 * attempt)
+            # Orçamento de espera por evento: um worker nunca fica parado mais que RETRY_TOTAL_WAIT_CAP.
+            if waited >= RETRY_TOTAL_WAIT_CAP:
+                break
+            # Retry-After: 0 significa "tente já": delay zero repete sem dormir.
+            delay = min(_retry_delay(attempt, resp), RETRY_TOTAL_WAIT_CAP - waited)
+            if delay > 0:
+                time.sleep(delay)
+                waited += delay
     return None
 
 
@@ -221,10 +311,15 @@ def enrich_events_with_markets(
     max_workers = min(max_workers, MAX_WORKERS_CAP)
 
     if max_workers == 1:
+        # IDs repetidos (janelas sobrepostas do fetch_events) reaproveitam o detalhe já buscado.
+        resolved: dict[str, dict | None] = {}
         for idx, event in enumerate(events, 1):
             event_id = event.get("event_id")
             if event_id:
-                full_payload = fetch_full_event(session, event_id)
+                if event_id in resolved:
+                    full_payload = resolved[event_id]
+                else:
+                    full_payload = resolved[event_id] = fetch_full_event(session, event_id)
                 if full_payload:
                     event["raw"] = full_payload
                 else:
@@ -237,41 +332,75 @@ def enrich_events_with_markets(
         return
 
     with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="superbet") as executor:
-        futures: dict = {}
-        for idx, event in enumerate(events, 1):
-            event_id = event.get("event_id")
-            if not event_id:
-                logging.warning("Evento sem event_id na posição %s será mantido sem enriquecimento", idx)
-                yield event
-                continue
-            future = executor.submit(fetch_full_event, None, event_id)
-            futures[future] = event
-
+        # Um único detalhamento por event_id; eventos repetidos aguardam o mesmo future.
+        in_flight: dict = {}
+        groups: dict[str, list[dict]] = {}
+        # Payloads já resolvidos; os eventos da lista de entrada os referenciam de qualquer forma.
+        resolved: dict[str, dict | None] = {}
+        # Janela limitada de submissões: até 2x workers futures pendentes (metade rodando, metade na fila do executor).
+        max_in_flight = 2 * max_workers
+        pending_events = enumerate(events, 1)
+        exhausted = False
         completed = 0
-        total_with_id = len(futures)
-        for future in as_completed(futures):
-            event = futures[future]
-            try:
-                full_payload = future.result()
-            except Exception as exc:
-                logging.warning("Erro ao detalhar evento %s: %s", event.get("event_id"), exc)
-                full_payload = None
-            if full_payload:
-                event["raw"] = full_payload
-            else:
-                logging.warning("Mantendo payload parcial para evento %s", event.get("event_id"))
-            completed += 1
-            if completed % 100 == 0 or completed == total_with_id:
-                logging.info("... %s/%s eventos enriquecidos em paralelo", completed, total_with_id)
-            yield event
-
-
+        total_with_id = len({event.get("event_id") for event in events if event.get("event_id")})
+        while True:
+            while not exhausted and len(in_flight) < max_in_flight:
+                item = next(pending_events, None)
+                if item is None:
+                    exhausted = True
+                    break
+                idx, event = item
+                event_id = event.get("event_id")
+                if not event_id:
+                    logging.warning("Evento sem event_id na posição %s será mantido sem enriquecimento", idx)
+                    yield event
+                    continue
+                if event_id in resolved:
+                    full_payload = resolved[event_id]
+                    if full_payload:
+                        event["raw"] = full_payload
+                    yield event
+                    continue
+                group = groups.get(event_id)
+                if group is not None:
+                    group.append(event)
+                    continue
+                groups[event_id] = [event]
+                in_flight[executor.submit(fetch_full_event, session, event_id)] = event_id
+            if not in_flight:
+                break
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                event_id = in_flight.pop(future)
+                try:
+                    full_payload = future.result()
+                except Exception as exc:
+                    logging.warning("Erro ao detalhar evento %s: %s", event_id, exc)
+                    full_payload = None
+                if not full_payload:
+                    logging.warning("Mantendo payload parcial para evento %s", event_id)
+                resolved[event_id] = full_payload
+                completed += 1
+                if completed % 100 == 0 or completed == total_with_id:
+                    logging.info("... %s/%s eventos enriquecidos em paralelo", completed, total_with_id)
+                for event in groups.pop(event_id):
+                    if full_payload:
+                        event["raw"] = full_payload
+                    yield event
+
+
+# Vários eventos dividem o mesmo horário de início; datetime é imutável, então o resultado pode ser compartilhado.
+@lru_cache(maxsize=4096)
 def parse_kickoff(value: str | None) -> datetime | None:
     if not value:
         return None
     value = value.strip()
     if not value:
         return None
+    # Formato dominante (YYYY-MM-DDTHH:MM:SSZ) sem passar pelo fromisoformat.
+    parsed = parse_utc_z(value)
+    if parsed is not None:
+        return parsed
     iso_value = value
     if iso_value.endswith("Z"):
         iso_value = iso_value[:-1] + "+00:00"
@@ -291,6 +420,7 @@ def filter_future_events(events: list[dict], allow_past: bool) -> list[dict]:
     upper_bound = lower_bound + timedelta(days=3)
     filtered: list[dict] = []
     skipped_past = skipped_future = skipped_missing = 0
+    _parse = parse_kickoff
     for event in events:
         kickoff = (
             event.get("kickoffRaw")
@@ -298,7 +428,7 @@ def filter_future_events(events: list[dict], allow_past: bool) -> list[dict]:
             or event.get("matchDate")
             or (event.get("raw") or {}).get("utcDate")
         )
-        kickoff_dt = parse_kickoff(kickoff)
+        kickoff_dt = _parse(kickoff)
         if not kickoff_dt:
             skipped_missing += 1
         elif kickoff_dt < lower_bound:
@@ -321,10 +451,14 @@ def filter_future_events(events: list[dict], allow_past: bool) -> list[dict]:
 
 def main(argv: Sequence[str] | None = None) -> None:
     args = parse_args(argv)
-    global EVENT_DETAILS_PARAMS, ALLOWED_MARKET_IDS
-    EVENT_DETAILS_PARAMS, ALLOWED_MARKET_IDS = build_event_params(args.include_markets)
-    session = requests.Session()
-    session.headers.update(superbet_mod.HEADERS)
+    parse_kickoff.cache_clear()
+    global EVENT_DETAILS_PARAMS, ALLOWED_MARKETS_SET, DETAIL_URL_TEMPLATE, VERIFY_SERVER_FILTER
+    EVENT_DETAILS_PARAMS, ALLOWED_MARKETS_SET = build_event_params(args.include_markets)
+    VERIFY_SERVER_FILTER = args.verify_server_filter
+    with _SERVER_FILTER_LOCK:
+        _SERVER_FILTER_STATS.update(events=0, extra_odds=0)
+    DETAIL_URL_TEMPLATE = build_detail_url_template(EVENT_DETAILS_PARAMS)
+    session = GLOBAL_SESSION
     logging.info(
         "Coletando Superbet v2 | dias=%s | includeMarkets=%s",
         args.days,
@@ -336,34 +470,53 @@ def main(argv: Sequence[str] | None = None) -> None:
     logging.info("Eventos após filtro temporal: %s", len(events))
 
     mongo_client = MongoClient(args.mongo_uri)
-    collection = mongo_client[args.mongo_db][args.mongo_collection]
+    collection = mongo_client[args.mongo_db][args.mongo_collection].with_options(
+        codec_options=RAW_CODEC_OPTIONS, write_concern=RAW_WRITE_CONCERN
+    )
+    # Upsert por eventId: o indice unico mantem cada ReplaceOne como busca pontual.
+    collection.create_index("eventId", unique=True)
+    # Fila curta: o enriquecimento segue enquanto lotes anteriores sao gravados, com no maximo 4 pendentes.
+    writer = BatchWriter(
+        partial(save_raw_events, args=args, client=mongo_client, collection=collection),
+        maxsize=4,
+        name="superbet-writer",
+    ).start()
+
+    json_file = None
+    if args.json:
+        args.json.parent.mkdir(parents=True, exist_ok=True)
+        json_file = args.json.open("wb")
+
     buffer: list[dict] = []
-    all_events: list[dict] = []
-    flushed = 0
-    for event in enrich_events_with_markets(session, events, args.max_workers):
-        all_events.append(event)
-        buffer.append(event)
-        if len(buffer) >= max(1, args.flush_size):
-            save_raw_events(buffer, args, client=mongo_client, collection=collection)
-            flushed += len(buffer)
-            buffer.clear()
-    if buffer:
-        save_raw_events(buffer, args, client=mongo_client, collection=collection)
-        flushed += len(buffer)
+    try:
+        for event in enrich_events_with_markets(session, events, args.max_workers):
+            if writer.error is not None:
+                # Mongo já falhou: não adianta seguir detalhando eventos que não serão gravados.
+                break
+            # Escrita incremental antes de enfileirar: nenhum acumulador com todos os eventos fica em memória.
+            if json_file is not None:
+                json_file.write(dumps_json_line(event))
+            buffer.append(event)
+            if len(buffer) >= max(1, args.flush_size):
+                writer.put(buffer)
+                buffer = []
+        if buffer:
+            writer.put(buffer)
+    finally:
+        writer.close()
+        if json_file is not None:
+            json_file.close()
     mongo_client.close()
-    logging.info("Eventos persistidos no Mongo: %s", flushed)
-
+    logging.info("Eventos persistidos no Mongo: %s", writer.saved)
+    writer.raise_if_failed()
     if args.json:
-        args.json.parent.mkdir(parents=True, exist_ok=True)
-        args.json.write_text(
-            json.dumps(
-                {"scraped_at": datetime.utcnow().isoformat(), "events": all_events},
-                ensure_ascii=False,
-                indent=2,
-            ),
-            encoding="utf-8",
-        )
         logging.info("Dump salvo em %s", args.json)
+    if VERIFY_SERVER_FILTER and ALLOWED_MARKETS_SET:
+        logging.info(
+            "Verificação includeMarkets: %s eventos detalhados, %s odds fora dos mercados pedidos",
+            _SERVER_FILTER_STATS["events"],
+            _SERVER_FILTER_STATS["extra_odds"],
+        )
     logging.info("Concluído")
 
 